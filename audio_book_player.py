@@ -1,16 +1,77 @@
 #!/usr/bin/env python3
-import json
+import gzip
+import hashlib
+import itertools
+import os
 import socket
 import threading
 import time
-from flask import Flask, request, jsonify, render_template, redirect, url_for
+import orjson
+from flask import Flask, Response, request, jsonify, redirect, url_for, abort
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.serving import WSGIRequestHandler
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that routes jsonify() and request.get_json() through orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+class NoDelayRequestHandler(WSGIRequestHandler):
+    """
+    Development server request handler that disables Nagle's algorithm, so
+    small JSON responses are not held back waiting for a delayed ACK.
+    gunicorn already sets TCP_NODELAY on its listening socket.
+    """
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Path to the mpv IPC socket. Adjust if necessary.
 MPV_SOCKET_PATH = "/tmp/mpv-socket"
 
-# Store playback state
+# Set DEV=1 to run the development server with the debugger and reloader
+DEV_MODE = bool(os.environ.get('DEV'))
+
+# How long (in seconds) to wait before reconnecting when mpv is unavailable
+MPV_RECONNECT_DELAY = 1
+
+# Minimum time (in seconds) between two state pushes to an /api/events client,
+# and how often an idle stream sends a keepalive comment
+EVENT_MIN_INTERVAL = 0.25
+EVENT_KEEPALIVE_INTERVAL = 15
+
+# How long (in seconds) slider changes are collected before being sent to mpv
+PROPERTY_COALESCE_DELAY = 0.05
+
+# mpv properties mirrored into playback_state. The watcher thread subscribes
+# to these with observe_property and mpv pushes their values on change.
+OBSERVED_PROPERTIES = (
+    "media-title", "filename", "duration", "time-pos", "pause",
+    "speed", "chapter", "chapter-list/count", "volume"
+)
+_mpv_properties = dict.fromkeys(OBSERVED_PROPERTIES)
+
+# Store playback state; guarded by _state_lock since the watcher thread
+# writes it while request handlers read it. _state_version is bumped on every
+# update and _state_changed is notified so /api/events streams can push it.
+_state_lock = threading.Lock()
+_state_changed = threading.Condition(_state_lock)
+_state_version = 0
+# playback_state serialized by _state_body(); reset whenever the state changes
+_state_bytes = None
 playback_state = {
     "filename": "Unknown",
     "duration": 0,
@@ -23,6 +84,85 @@ playback_state = {
     "last_updated": 0
 }
 
+# Persistent connection to the mpv IPC socket, shared by all threads
+_sock_lock = threading.Lock()
+_sock = None
+_sock_file = None
+_request_ids = itertools.count(1)
+
+def _get_sock_file():
+    """
+    Returns a buffered file over the cached mpv IPC connection, connecting on
+    first use. mpv frames every message with a newline, so replies are read
+    with readline() and each recv() picks up whatever mpv has already sent.
+    """
+    global _sock, _sock_file
+    if _sock is None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(MPV_SOCKET_PATH)
+        except OSError:
+            sock.close()
+            raise
+        _sock = sock
+        _sock_file = sock.makefile('rwb', buffering=65536)
+    return _sock_file
+
+def _close_sock():
+    """Drops the cached connection so the next request reconnects"""
+    global _sock, _sock_file
+    if _sock is not None:
+        for conn in (_sock_file, _sock):
+            try:
+                conn.close()
+            except OSError:
+                pass
+        _sock = None
+        _sock_file = None
+
+def _write_batch(batch):
+    """Writes raw command lines to mpv. Must be called with _sock_lock held."""
+    try:
+        sock_file = _get_sock_file()
+        sock_file.write(batch)
+        sock_file.flush()
+    except OSError:
+        # mpv went away since the last request; reconnect once and retry
+        _close_sock()
+        sock_file = _get_sock_file()
+        sock_file.write(batch)
+        sock_file.flush()
+
+def _send_batch(commands):
+    """
+    Sends a batch of mpv commands over the persistent connection and returns
+    their replies in the same order. Must be called with _sock_lock held.
+    Every command is tagged with its own request_id so the replies can be
+    told apart from each other and from unsolicited event messages.
+    """
+    pending = {next(_request_ids): i for i in range(len(commands))}
+    _write_batch(b"".join(
+        orjson.dumps({"command": command, "request_id": rid}) + b"\n"
+        for rid, command in zip(pending, commands)
+    ))
+    
+    replies = [None] * len(commands)
+    try:
+        while pending:
+            line = _sock_file.readline()
+            if not line:
+                raise ConnectionError("mpv closed the IPC connection")
+            if line == b"\n":
+                continue
+            reply = orjson.loads(line)
+            index = pending.pop(reply.get("request_id"), None)
+            if index is not None:
+                replies[index] = reply
+    except Exception:
+        _close_sock()
+        raise
+    return replies
+
 def send_command(command, args=None):
     """
     Sends a JSON command to mpv via its IPC socket and returns the response.
@@ -30,74 +170,167 @@ def send_command(command, args=None):
     if args is None:
         args = []
     
-    payload = {
-        "command": [command] + args,
-    }
-    
     try:
-        # Create a UNIX socket connection
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.connect(MPV_SOCKET_PATH)
-        
-        # Send the command as a JSON string, ending with a newline
-        sock.sendall((json.dumps(payload) + "\n").encode('utf-8'))
-        
-        # Read the response
-        response = sock.recv(1024)
-        sock.close()
-        
-        return json.loads(response.decode('utf-8'))
+        with _sock_lock:
+            return _send_batch([[command] + args])[0]
     except Exception as e:
         print(f"Error communicating with mpv: {e}")
         return {"error": str(e)}
 
-def get_property(property_name):
-    """Convenience function to get an mpv property"""
-    result = send_command("get_property", [property_name])
-    if "data" in result:
-        return result["data"]
-    return None
-
 def update_playback_state():
-    """Updates the playback state with current information from mpv"""
-    global playback_state
+    """Updates the playback state from the latest observed mpv properties"""
+    global playback_state, _state_version, _state_bytes
     
-    try:
-        playback_state["filename"] = get_property("media-title") or get_property("filename") or "Unknown"
-        playback_state["duration"] = get_property("duration") or 0
-        playback_state["position"] = get_property("time-pos") or 0
-        playback_state["paused"] = get_property("pause") or False
-        playback_state["speed"] = get_property("speed") or 1.0
-        playback_state["chapter"] = get_property("chapter") or 0
-        playback_state["chapter_count"] = get_property("chapter-list/count") or 0
-        playback_state["volume"] = get_property("volume") or 100
+    props = _mpv_properties
+    with _state_lock:
+        playback_state["filename"] = props["media-title"] or props["filename"] or "Unknown"
+        playback_state["duration"] = props["duration"] or 0
+        playback_state["position"] = props["time-pos"] or 0
+        playback_state["paused"] = props["pause"] or False
+        playback_state["speed"] = props["speed"] or 1.0
+        playback_state["chapter"] = props["chapter"] or 0
+        playback_state["chapter_count"] = props["chapter-list/count"] or 0
+        playback_state["volume"] = props["volume"] or 100
         playback_state["last_updated"] = time.time()
-    except Exception as e:
-        print(f"Error updating playback state: {e}")
+        _state_version += 1
+        _state_bytes = None
+        _state_changed.notify_all()
+
+def _state_body():
+    """
+    Returns playback_state as JSON bytes, serializing it at most once per
+    state version so concurrent clients share one buffer.
+    Must be called with _state_lock held.
+    """
+    global _state_bytes
+    if _state_bytes is None:
+        _state_bytes = orjson.dumps(playback_state)
+    return _state_bytes
 
-def state_updater():
-    """Background thread to periodically update playback state"""
+def state_watcher():
+    """
+    Background thread that keeps playback state in sync with mpv.
+    Observes every property in OBSERVED_PROPERTIES on a dedicated connection
+    and applies the property-change events mpv pushes, so nothing is polled.
+    """
+    observe_batch = b"".join(
+        orjson.dumps({"command": ["observe_property", observe_id, name]}) + b"\n"
+        for observe_id, name in enumerate(OBSERVED_PROPERTIES, start=1)
+    )
     while True:
         try:
-            update_playback_state()
-        except:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(MPV_SOCKET_PATH)
+                sock.sendall(observe_batch)
+                with sock.makefile('rb') as events:
+                    for line in events:
+                        message = orjson.loads(line)
+                        if message.get("event") != "property-change":
+                            continue
+                        name = message.get("name")
+                        data = message.get("data")
+                        # mpv may re-announce a property without a new value,
+                        # e.g. the per-file ones around every file load; only
+                        # real changes update the state and wake /api/events
+                        if name in _mpv_properties and _mpv_properties[name] != data:
+                            _mpv_properties[name] = data
+                            update_playback_state()
+        except Exception:
             pass
-        time.sleep(1)
+        
+        # mpv is not running (or just quit); reset the state and retry. While
+        # it stays down the state is already reset, so streams are not woken.
+        if any(value is not None for value in _mpv_properties.values()):
+            for name in OBSERVED_PROPERTIES:
+                _mpv_properties[name] = None
+            update_playback_state()
+        time.sleep(MPV_RECONNECT_DELAY)
+
+# Latest slider values waiting to be sent to mpv, keyed by property name
+_pending_lock = threading.Lock()
+_pending_event = threading.Event()
+_pending_properties = {}
 
-# Start the background updater thread
-update_thread = threading.Thread(target=state_updater, daemon=True)
-update_thread.start()
+def queue_property(name, value):
+    """Queues a property change for property_writer, replacing any older value"""
+    with _pending_lock:
+        _pending_properties[name] = value
+        _pending_event.set()
+
+def property_writer():
+    """
+    Background thread that applies queued property changes to mpv.
+    Changes arriving within PROPERTY_COALESCE_DELAY of each other are
+    coalesced, so a slider drag only sends the final value of each property.
+    """
+    global _pending_properties
+    while True:
+        _pending_event.wait()
+        time.sleep(PROPERTY_COALESCE_DELAY)
+        with _pending_lock:
+            pending, _pending_properties = _pending_properties, {}
+            _pending_event.clear()
+        try:
+            with _sock_lock:
+                _send_batch([["set_property", name, value] for name, value in pending.items()])
+        except Exception as e:
+            print(f"Error communicating with mpv: {e}")
+
+# Start the background watcher and writer threads. In DEV mode the Werkzeug
+# reloader imports this module in both its watching parent and the serving
+# child; only the child (WERKZEUG_RUN_MAIN) should open connections to mpv.
+if not DEV_MODE or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    watcher_thread = threading.Thread(target=state_watcher, daemon=True)
+    watcher_thread.start()
+    writer_thread = threading.Thread(target=property_writer, daemon=True)
+    writer_thread.start()
+
+def _json_body():
+    """Parses the JSON request body with orjson directly, or aborts with 400"""
+    try:
+        return orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError:
+        abort(400)
 
 @app.route('/')
 def index():
     """Serve the main control page"""
-    return render_template('index.html')
+    return _index_response()
 
 @app.route('/api/state')
 def get_state():
     """Return the current playback state as JSON"""
-    update_playback_state()  # Get fresh state before returning
-    return jsonify(playback_state)
+    # The background watcher keeps playback_state fresh; just serialize it
+    with _state_lock:
+        body = _state_body()
+    return Response(body, mimetype='application/json')
+
+@app.route('/api/events')
+def events():
+    """Stream the playback state as Server-Sent Events whenever it changes"""
+    def stream():
+        version = None
+        while True:
+            with _state_changed:
+                _state_changed.wait_for(lambda: _state_version != version, EVENT_KEEPALIVE_INTERVAL)
+                if _state_version == version:
+                    body = None
+                else:
+                    version = _state_version
+                    body = _state_body()
+            if body is None:
+                yield b": keepalive\n\n"
+                continue
+            # time-pos changes continuously during playback; cap the push rate.
+            # The deadline is taken before the write so time spent blocked on
+            # a slow client counts towards the interval instead of adding to it.
+            next_push = time.monotonic() + EVENT_MIN_INTERVAL
+            yield b"data: " + body + b"\n\n"
+            time.sleep(max(0, next_push - time.monotonic()))
+    
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/toggle_pause', methods=['POST'])
 def toggle_pause():
@@ -116,30 +349,30 @@ def quit():
 
 @app.route('/api/seek', methods=['POST'])
 def seek():
-    data = request.get_json()
+    data = _json_body()
     seconds = data.get('seconds', 0)
     send_command("seek", [float(seconds), "relative"])
     return jsonify({"status": "success"})
 
 @app.route('/api/seek_absolute', methods=['POST'])
 def seek_absolute():
-    data = request.get_json()
+    data = _json_body()
     position = data.get('position', 0)
     send_command("seek", [float(position), "absolute"])
     return jsonify({"status": "success"})
 
 @app.route('/api/set_speed', methods=['POST'])
 def set_speed():
-    data = request.get_json()
+    data = _json_body()
     speed = data.get('speed', 1.0)
-    send_command("set_property", ["speed", float(speed)])
+    queue_property("speed", float(speed))
     return jsonify({"status": "success"})
 
 @app.route('/api/set_volume', methods=['POST'])
 def set_volume():
-    data = request.get_json()
+    data = _json_body()
     volume = data.get('volume', 100)
-    send_command("set_property", ["volume", float(volume)])
+    queue_property("volume", float(volume))
     return jsonify({"status": "success"})
 
 @app.route('/api/next_chapter', methods=['POST'])
@@ -162,520 +395,42 @@ def skip_backward():
     send_command("seek", [-10, "relative"])
     return jsonify({"status": "success"})
 
-# Create the templates folder and HTML template
-@app.route('/templates/index.html')
-def serve_template():
-    html = """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>MPV Remote Control</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, Helvetica, Arial, sans-serif;
-        }
-        
-        body {
-            background-color: #121212;
-            color: #ffffff;
-            padding: 20px;
-            max-width: 800px;
-            margin: 0 auto;
-        }
-        
-        h1 {
-            text-align: center;
-            margin-bottom: 20px;
-            font-size: 1.8rem;
-        }
-        
-        .card {
-            background-color: #1e1e1e;
-            border-radius: 10px;
-            padding: 20px;
-            margin-bottom: 20px;
-            box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
-        }
-        
-        .now-playing {
-            text-align: center;
-            margin-bottom: 5px;
-        }
-        
-        .filename {
-            font-size: 1.2rem;
-            font-weight: bold;
-            margin-bottom: 10px;
-            overflow: hidden;
-            text-overflow: ellipsis;
-            white-space: nowrap;
-        }
-        
-        .playback-info {
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 10px;
-            font-size: 0.9rem;
-            color: #aaaaaa;
-        }
-        
-        .progress-container {
-            width: 100%;
-            height: 30px;
-            position: relative;
-            margin-bottom: 20px;
-        }
-        
-        .progress-bar {
-            width: 100%;
-            height: 6px;
-            background-color: #333333;
-            border-radius: 3px;
-            position: absolute;
-            top: 50%;
-            transform: translateY(-50%);
-        }
-        
-        .progress-fill {
-            height: 100%;
-            background-color: #1db954;
-            border-radius: 3px;
-            width: 0%;
-        }
-        
-        .progress-handle {
-            width: 16px;
-            height: 16px;
-            background-color: #ffffff;
-            border-radius: 50%;
-            position: absolute;
-            top: 50%;
-            transform: translate(-50%, -50%);
-            cursor: pointer;
-        }
-        
-        .control-row {
-            display: flex;
-            justify-content: center;
-            gap: 15px;
-            margin-bottom: 15px;
-        }
-        
-        .btn {
-            background-color: #333333;
-            color: white;
-            border: none;
-            border-radius: 50%;
-            width: 50px;
-            height: 50px;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            transition: background-color 0.2s;
-        }
-        
-        .btn:hover {
-            background-color: #444444;
-        }
-        
-        .btn.primary {
-            background-color: #1db954;
-        }
-        
-        .btn.primary:hover {
-            background-color: #1ed760;
-        }
-        
-        .slider-container {
-            display: flex;
-            align-items: center;
-            gap: 10px;
-            margin-bottom: 15px;
-        }
-        
-        .slider-label {
-            width: 100px;
-            font-size: 0.9rem;
-        }
-        
-        .slider {
-            flex: 1;
-            -webkit-appearance: none;
-            height: 5px;
-            border-radius: 5px;
-            background: #333333;
-            outline: none;
-        }
-        
-        .slider::-webkit-slider-thumb {
-            -webkit-appearance: none;
-            appearance: none;
-            width: 15px;
-            height: 15px;
-            border-radius: 50%;
-            background: #1db954;
-            cursor: pointer;
-        }
-        
-        .slider-value {
-            width: 60px;
-            text-align: right;
-            font-size: 0.9rem;
-        }
-        
-        .skip-controls {
-            display: flex;
-            justify-content: space-between;
-            gap: 10px;
-            margin-top: 20px;
-        }
-        
-        .skip-btn {
-            flex: 1;
-            padding: 12px;
-            background-color: #333333;
-            color: white;
-            border: none;
-            border-radius: 5px;
-            cursor: pointer;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-            gap: 5px;
-            font-size: 0.9rem;
-        }
-        
-        .skip-btn:hover {
-            background-color: #444444;
-        }
-        
-        .icon {
-            font-size: 24px;
-            line-height: 1;
-        }
-        
-        @media (max-width: 480px) {
-            body {
-                padding: 10px;
-            }
-            
-            h1 {
-                font-size: 1.5rem;
-            }
-            
-            .btn {
-                width: 45px;
-                height: 45px;
-            }
-            
-            .slider-label {
-                width: 80px;
-            }
-        }
-    </style>
-</head>
-<body>
-    <h1>MPV Remote Control</h1>
-    
-    <div class="card">
-        <div class="now-playing">Now Playing</div>
-        <div id="filename" class="filename">Loading...</div>
-        
-        <div class="playback-info">
-            <div id="current-time">00:00</div>
-            <div id="duration">00:00</div>
-        </div>
-        
-        <div class="progress-container" id="progress-container">
-            <div class="progress-bar">
-                <div class="progress-fill" id="progress-fill"></div>
-            </div>
-            <div class="progress-handle" id="progress-handle"></div>
-        </div>
-        
-        <div class="control-row">
-            <button class="btn" id="prev-chapter-btn" title="Previous Chapter">
-                <span class="icon">⏮</span>
-            </button>
-            <button class="btn" id="rewind-btn" title="Rewind 10s">
-                <span class="icon">⏪</span>
-            </button>
-            <button class="btn primary" id="play-pause-btn" title="Play/Pause">
-                <span class="icon" id="play-pause-icon">⏸</span>
-            </button>
-            <button class="btn" id="forward-btn" title="Forward 30s">
-                <span class="icon">⏩</span>
-            </button>
-            <button class="btn" id="next-chapter-btn" title="Next Chapter">
-                <span class="icon">⏭</span>
-            </button>
-        </div>
-        
-        <div class="slider-container">
-            <div class="slider-label">Volume</div>
-            <input type="range" min="0" max="100" value="100" class="slider" id="volume-slider">
-            <div class="slider-value" id="volume-value">100%</div>
-        </div>
-        
-        <div class="slider-container">
-            <div class="slider-label">Speed</div>
-            <input type="range" min="50" max="200" value="100" class="slider" id="speed-slider">
-            <div class="slider-value" id="speed-value">1.0x</div>
-        </div>
-        
-        <div class="skip-controls">
-            <button class="skip-btn" id="skip-back-btn">
-                <span class="icon">-10</span> Seconds
-            </button>
-            <button class="skip-btn" id="skip-forward-btn">
-                <span class="icon">+30</span> Seconds
-            </button>
-        </div>
-    </div>
-    
-    <div class="card">
-        <div class="skip-controls">
-            <button class="skip-btn" id="stop-btn">Stop</button>
-            <button class="skip-btn" id="quit-btn">Quit MPV</button>
-        </div>
-    </div>
-
-    <script>
-        // State variables
-        let dragging = false;
-        let mpvState = {
-            position: 0,
-            duration: 0,
-            paused: true,
-            speed: 1.0,
-            volume: 100
-        };
-        
-        // DOM Elements
-        const filenameEl = document.getElementById('filename');
-        const currentTimeEl = document.getElementById('current-time');
-        const durationEl = document.getElementById('duration');
-        const progressFillEl = document.getElementById('progress-fill');
-        const progressHandleEl = document.getElementById('progress-handle');
-        const progressContainerEl = document.getElementById('progress-container');
-        const playPauseBtn = document.getElementById('play-pause-btn');
-        const playPauseIcon = document.getElementById('play-pause-icon');
-        const prevChapterBtn = document.getElementById('prev-chapter-btn');
-        const nextChapterBtn = document.getElementById('next-chapter-btn');
-        const rewindBtn = document.getElementById('rewind-btn');
-        const forwardBtn = document.getElementById('forward-btn');
-        const volumeSlider = document.getElementById('volume-slider');
-        const volumeValue = document.getElementById('volume-value');
-        const speedSlider = document.getElementById('speed-slider');
-        const speedValue = document.getElementById('speed-value');
-        const skipBackBtn = document.getElementById('skip-back-btn');
-        const skipForwardBtn = document.getElementById('skip-forward-btn');
-        const stopBtn = document.getElementById('stop-btn');
-        const quitBtn = document.getElementById('quit-btn');
-        
-        // Helper Functions
-        function formatTime(seconds) {
-            if (!seconds) return '00:00';
-            
-            const mins = Math.floor(seconds / 60);
-            const secs = Math.floor(seconds % 60);
-            return `${mins.toString().padStart(2, '0')}:${secs.toString().padStart(2, '0')}`;
-        }
-        
-        function updateProgressBar() {
-            const percentage = (mpvState.position / mpvState.duration) * 100 || 0;
-            progressFillEl.style.width = `${percentage}%`;
-            progressHandleEl.style.left = `${percentage}%`;
-            currentTimeEl.textContent = formatTime(mpvState.position);
-            durationEl.textContent = formatTime(mpvState.duration);
-        }
-        
-        function updatePlayPauseButton() {
-            playPauseIcon.textContent = mpvState.paused ? '▶' : '⏸';
-        }
-        
-        // API Functions
-        async function fetchState() {
-            try {
-                const response = await fetch('/api/state');
-                const data = await response.json();
-                
-                mpvState = {
-                    position: data.position || 0,
-                    duration: data.duration || 0,
-                    paused: data.paused || true,
-                    filename: data.filename || 'No file',
-                    speed: data.speed || 1.0,
-                    volume: data.volume || 100,
-                    chapter: data.chapter,
-                    chapter_count: data.chapter_count
-                };
-                
-                filenameEl.textContent = mpvState.filename;
-                volumeSlider.value = mpvState.volume;
-                volumeValue.textContent = `${Math.round(mpvState.volume)}%`;
-                speedSlider.value = mpvState.speed * 100;
-                speedValue.textContent = `${mpvState.speed.toFixed(1)}x`;
-                
-                updateProgressBar();
-                updatePlayPauseButton();
-                
-                // Update chapter navigation buttons state
-                prevChapterBtn.disabled = mpvState.chapter <= 0;
-                nextChapterBtn.disabled = mpvState.chapter >= mpvState.chapter_count - 1;
-                
-            } catch (error) {
-                console.error('Error fetching state:', error);
-            }
-        }
-        
-        async function sendCommand(endpoint, data = {}) {
-            try {
-                const response = await fetch(`/api/${endpoint}`, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify(data)
-                });
-                
-                // Immediately update state after command
-                setTimeout(fetchState, 100);
-                return await response.json();
-            } catch (error) {
-                console.error(`Error with ${endpoint}:`, error);
-            }
-        }
-        
-        // Event Listeners
-        playPauseBtn.addEventListener('click', () => {
-            sendCommand('toggle_pause');
-        });
-        
-        rewindBtn.addEventListener('click', () => {
-            sendCommand('seek', { seconds: -10 });
-        });
-        
-        forwardBtn.addEventListener('click', () => {
-            sendCommand('seek', { seconds: 30 });
-        });
-        
-        prevChapterBtn.addEventListener('click', () => {
-            sendCommand('prev_chapter');
-        });
-        
-        nextChapterBtn.addEventListener('click', () => {
-            sendCommand('next_chapter');
-        });
-        
-        skipBackBtn.addEventListener('click', () => {
-            sendCommand('seek', { seconds: -10 });
-        });
-        
-        skipForwardBtn.addEventListener('click', () => {
-            sendCommand('seek', { seconds: 30 });
-        });
-        
-        stopBtn.addEventListener('click', () => {
-            sendCommand('stop');
-        });
-        
-        quitBtn.addEventListener('click', () => {
-            if (confirm('Are you sure you want to quit MPV?')) {
-                sendCommand('quit');
-            }
-        });
-        
-        volumeSlider.addEventListener('input', () => {
-            const value = volumeSlider.value;
-            volumeValue.textContent = `${value}%`;
-        });
-        
-        volumeSlider.addEventListener('change', () => {
-            const value = volumeSlider.value;
-            sendCommand('set_volume', { volume: Number(value) });
-        });
-        
-        speedSlider.addEventListener('input', () => {
-            const value = speedSlider.value / 100;
-            speedValue.textContent = `${value.toFixed(1)}x`;
-        });
-        
-        speedSlider.addEventListener('change', () => {
-            const value = speedSlider.value / 100;
-            sendCommand('set_speed', { speed: value });
-        });
-        
-        // Progress bar seeking
-        progressContainerEl.addEventListener('mousedown', (e) => {
-            dragging = true;
-            updateSeekPosition(e);
-        });
-        
-        progressContainerEl.addEventListener('touchstart', (e) => {
-            dragging = true;
-            updateSeekPosition(e.touches[0]);
-        });
-        
-        document.addEventListener('mousemove', (e) => {
-            if (dragging) {
-                updateSeekPosition(e);
-            }
-        });
-        
-        document.addEventListener('touchmove', (e) => {
-            if (dragging) {
-                updateSeekPosition(e.touches[0]);
-                e.preventDefault();
-            }
-        });
-        
-        document.addEventListener('mouseup', () => {
-            if (dragging) {
-                dragging = false;
-                const percentage = parseFloat(progressHandleEl.style.left) / 100;
-                const position = percentage * mpvState.duration;
-                sendCommand('seek_absolute', { position });
-            }
-        });
-        
-        document.addEventListener('touchend', () => {
-            if (dragging) {
-                dragging = false;
-                const percentage = parseFloat(progressHandleEl.style.left) / 100;
-                const position = percentage * mpvState.duration;
-                sendCommand('seek_absolute', { position });
-            }
-        });
-        
-        function updateSeekPosition(e) {
-            const rect = progressContainerEl.getBoundingClientRect();
-            let x = e.clientX - rect.left;
-            x = Math.max(0, Math.min(x, rect.width));
-            
-            const percentage = (x / rect.width) * 100;
-            progressFillEl.style.width = `${percentage}%`;
-            progressHandleEl.style.left = `${percentage}%`;
-            
-            const position = (percentage / 100) * mpvState.duration;
-            currentTimeEl.textContent = formatTime(position);
-        }
-        
-        // Initialize and set up polling
-        fetchState();
-        setInterval(fetchState, 1000);
-    </script>
-</body>
-</html>
-    """
-    return html
+# Main control page, loaded from the static folder once at import. It has no
+# template variables, so it is served as-is with an ETag for conditional GETs.
+with open(os.path.join(app.static_folder, 'audio_book_player.html'), 'rb') as f:
+    _INDEX_BYTES = f.read()
+
+# Copies of the page keyed by content encoding, in order of preference, each
+# with its ETag. Brotli is only offered when the optional brotli package is
+# installed; None is the uncompressed fallback. gzip gets a fixed mtime so its
+# bytes, and therefore its ETag, stay the same across restarts.
+_INDEX_VARIANTS = {}
+if brotli is not None:
+    _INDEX_VARIANTS["br"] = brotli.compress(_INDEX_BYTES)
+_INDEX_VARIANTS["gzip"] = gzip.compress(_INDEX_BYTES, 9, mtime=0)
+_INDEX_VARIANTS[None] = _INDEX_BYTES
+_INDEX_VARIANTS = {
+    encoding: (body, hashlib.sha1(body).hexdigest())
+    for encoding, body in _INDEX_VARIANTS.items()
+}
+
+def _index_response():
+    """Builds a response for the main control page from the pre-encoded HTML"""
+    for encoding, (body, etag) in _INDEX_VARIANTS.items():
+        if encoding is None or request.accept_encodings.quality(encoding) > 0:
+            break
+    response = Response(body, mimetype='text/html')
+    if encoding is not None:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = 'public, max-age=3600'
+    response.vary.add('Accept-Encoding')
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 if __name__ == '__main__':
+    # Development server only. For regular use run it under gunicorn:
+    #   gunicorn audio_book_player:app -w 1 --threads 8 -b 0.0.0.0:5000
+    # Keep a single worker: playback_state and the mpv connections live in
+    # this process, and every extra worker would run its own watcher thread.
     # Listen on all interfaces so your phone can access it
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app.run(host="0.0.0.0", port=5000, debug=DEV_MODE, request_handler=NoDelayRequestHandler)
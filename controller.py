@@ -1,63 +1,252 @@
-from flask import Flask, render_template_string, jsonify, request
+from flask import Flask, Response, abort, jsonify, request, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.serving import WSGIRequestHandler
+import os
+import queue
 import socket
-import json
 import subprocess
+import threading
+from concurrent.futures import Future
+import orjson
+
+class ORJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that serializes jsonify() responses with orjson.
+    """
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+class NoDelayRequestHandler(WSGIRequestHandler):
+    """
+    Development server request handler that disables Nagle's algorithm, so
+    small JSON responses are not held back waiting for a delayed ACK.
+    """
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Path to the mpv IPC socket
 MPV_SOCKET = "/tmp/mpvsocket"
-# Global variable to hold the current mpv process
+# How long (in seconds) browsers may cache the pages before revalidating
+PAGE_MAX_AGE = 3600
+# How long (in seconds) a request waits for the writer thread to send its command
+COMMAND_TIMEOUT = 2
+# Global variable to hold the current mpv process, guarded by _process_lock
 mpv_process = None
+_process_lock = threading.Lock()
+# The fixed commands sent by the routes, encoded once at import
+CMD_TOGGLE = orjson.dumps({"command": ["cycle", "pause"]}) + b'\n'
+CMD_VOL_UP = orjson.dumps({"command": ["add", "volume", 10]}) + b'\n'
+CMD_VOL_DOWN = orjson.dumps({"command": ["add", "volume", -10]}) + b'\n'
+CMD_QUIT = orjson.dumps({"command": ["quit"]}) + b'\n'
+# The only two bodies /cmd/<name> ever returns, built once. Nothing in this
+# app (no sessions, no after_request hooks) modifies a response after the view
+# returns it, so the same objects can be reused for every request.
+_OK = Response(b'{"success":true}', mimetype='application/json')
+_FAIL = Response(b'{"success":false}', mimetype='application/json')
 
-def send_mpv_command(command):
+# Commands available through /cmd/<name>
+CMDS = {
+    'toggle': CMD_TOGGLE,
+    'volup': CMD_VOL_UP,
+    'voldown': CMD_VOL_DOWN,
+    'stop': CMD_QUIT,
+}
+
+# Long-lived connection to the mpv IPC socket, created on first use. Only
+# the command writer thread touches it.
+_mpv_sock = None
+_mpv_fd = None
+# (command line, Future) pairs waiting for the writer thread, which resolves
+# each Future to whether its command was sent. A None entry asks the writer
+# to close the connection once everything queued before it is sent.
+_cmd_queue = queue.Queue()
+
+def _connect_mpv():
     """
-    Connect to the mpv IPC socket and send a JSON command.
-    Returns True if the command was sent successfully.
+    Return the cached mpv IPC connection, connecting on first use.
+    Only called from the command writer thread.
     """
-    try:
+    global _mpv_sock, _mpv_fd
+    if _mpv_sock is None:
+        # mpv's IPC server only listens with SOCK_STREAM and frames commands
+        # by newline, so SOCK_SEQPACKET is not an option. Unix stream sockets
+        # have no Nagle or delayed-ACK behaviour, so no tuning is needed either.
         sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.connect(MPV_SOCKET)
-        msg = json.dumps(command).encode('utf-8')
-        sock.sendall(msg + b'\n')
-        sock.close()
-        return True
+        try:
+            sock.connect(MPV_SOCKET)
+        except OSError:
+            sock.close()
+            raise
+        _mpv_sock = sock
+        _mpv_fd = sock.fileno()
+    return _mpv_sock
+
+def _close_mpv():
+    """
+    Close the cached mpv IPC connection so the next command reconnects.
+    Only called from the command writer thread.
+    """
+    global _mpv_sock, _mpv_fd
+    if _mpv_sock is not None:
+        _mpv_sock.close()
+        _mpv_sock = None
+        _mpv_fd = None
+
+def _drain_mpv(sock):
+    """
+    Discard replies and events mpv has sent since the last command.
+    Nothing reads them otherwise, and once the socket buffer fills up mpv
+    stops serving the connection. Raises ConnectionError if mpv has closed it.
+    """
+    while True:
+        try:
+            data = sock.recv(65536, socket.MSG_DONTWAIT)
+        except BlockingIOError:
+            return
+        if not data:
+            raise ConnectionError("mpv closed the IPC connection")
+
+def _write_mpv(payload):
+    """
+    Write encoded command lines over the persistent mpv IPC connection.
+    Returns True if they were sent successfully.
+    """
+    for attempt in range(2):
+        try:
+            sock = _connect_mpv()
+            _drain_mpv(sock)
+            # Command lines are tiny and almost always go out in one write(2)
+            # on the raw fd; sendall() only picks up after a partial write
+            try:
+                written = os.write(_mpv_fd, payload)
+            except BlockingIOError:
+                written = 0
+            if written < len(payload):
+                sock.sendall(payload[written:])
+            return True
+        except Exception as e:
+            # The connection may be stale (e.g. mpv was restarted);
+            # drop it and retry once on a fresh one
+            _close_mpv()
+            if attempt:
+                print("Error sending command:", e)
+    return False
+
+def command_writer():
+    """
+    Background thread that sends queued commands to mpv. Everything queued
+    while the previous write was in flight goes out in a single sendall(),
+    since mpv accepts several newline-delimited commands at once.
+    """
+    while True:
+        items = [_cmd_queue.get()]
+        while True:
+            try:
+                items.append(_cmd_queue.get_nowait())
+            except queue.Empty:
+                break
+        payload = b''
+        futures = []
+        for item in items:
+            if item is None:
+                if payload:
+                    _flush_commands(payload, futures)
+                    payload = b''
+                    futures = []
+                _close_mpv()
+            else:
+                payload += item[0]
+                futures.append(item[1])
+        if payload:
+            _flush_commands(payload, futures)
+
+def _flush_commands(payload, futures):
+    """Write a batch of command lines and report the outcome to their senders."""
+    success = _write_mpv(payload)
+    for future in futures:
+        future.set_result(success)
+
+def _queue_mpv_bytes(payload):
+    """
+    Queue an already encoded, newline-terminated command line for the
+    command writer thread. Returns a Future that resolves to whether it was sent.
+    """
+    future = Future()
+    _cmd_queue.put((payload, future))
+    return future
+
+def _sent(future):
+    """Wait for a queued command to be written. Returns True if it was sent."""
+    try:
+        return future.result(timeout=COMMAND_TIMEOUT)
     except Exception as e:
-        print("Error sending command:", e)
+        print("Error waiting for command to be sent:", e)
         return False
 
-@app.route('/toggle', methods=['POST'])
-def toggle():
-    command = {"command": ["cycle", "pause"]}
-    success = send_mpv_command(command)
-    return jsonify({"success": success})
-
-@app.route('/volume/up', methods=['POST'])
-def volume_up():
-    command = {"command": ["add", "volume", 10]}
-    success = send_mpv_command(command)
-    return jsonify({"success": success})
-
-@app.route('/volume/down', methods=['POST'])
-def volume_down():
-    command = {"command": ["add", "volume", -10]}
-    success = send_mpv_command(command)
-    return jsonify({"success": success})
-
-@app.route('/stop', methods=['POST'])
-def stop():
+def send_mpv_bytes(payload):
+    """
+    Send an already encoded, newline-terminated command line through the
+    command writer thread. Returns True if it was sent successfully.
+    """
+    return _sent(_queue_mpv_bytes(payload))
+
+def send_mpv_command(command):
+    """
+    Encode a JSON command and send it through the command writer thread.
+    Returns True if it was sent successfully.
+    """
+    return send_mpv_bytes(orjson.dumps(command) + b'\n')
+
+# Start the background command writer
+writer_thread = threading.Thread(target=command_writer, daemon=True)
+writer_thread.start()
+
+def _reap(process):
+    """
+    Wait for an mpv process that was asked to quit, terminating it if it
+    does not exit in time. Runs in a background thread.
+    """
+    try:
+        process.wait(timeout=5)
+    except Exception as e:
+        print("Error waiting for mpv to quit:", e)
+        process.terminate()
+        process.wait()
+
+def stop_mpv():
+    """
+    Ask the mpv process started by /launch to quit.
+    Returns True if there was a process and the quit command was sent.
+    """
     global mpv_process
-    success = False
-    if mpv_process is not None:
-        command = {"command": ["quit"]}
-        success = send_mpv_command(command)
-        try:
-            mpv_process.wait(timeout=5)
-        except Exception as e:
-            print("Error waiting for mpv to quit:", e)
-            mpv_process.terminate()
-        mpv_process = None
-    return jsonify({"success": success})
+    quit_sent = None
+    with _process_lock:
+        if mpv_process is not None:
+            quit_sent = _queue_mpv_bytes(CMD_QUIT)
+            # The next mpv instance listens on a fresh socket
+            _cmd_queue.put(None)
+            # Wait for mpv to exit off the request thread
+            threading.Thread(target=_reap, args=(mpv_process,), daemon=True).start()
+            mpv_process = None
+    return quit_sent is not None and _sent(quit_sent)
+
+@app.route('/cmd/<name>', methods=['POST'])
+def cmd(name):
+    payload = CMDS.get(name)
+    if payload is None:
+        abort(404)
+    if payload is CMD_QUIT:
+        success = stop_mpv()
+    else:
+        success = send_mpv_bytes(payload)
+    return _OK if success else _FAIL
 
 @app.route('/launch', methods=['GET', 'POST'])
 def launch():
@@ -65,165 +254,43 @@ def launch():
     if request.method == 'POST':
         stream = request.form.get('stream')
         if stream:
-            if mpv_process is not None:
-                try:
-                    mpv_process.terminate()
-                    mpv_process.wait(timeout=5)
-                except Exception as e:
-                    print("Error terminating mpv:", e)
-            cmd = ['mpv', f'--input-ipc-server={MPV_SOCKET}', stream]
-            mpv_process = subprocess.Popen(cmd)
+            with _process_lock:
+                if mpv_process is not None:
+                    try:
+                        mpv_process.terminate()
+                        mpv_process.wait(timeout=5)
+                    except Exception as e:
+                        print("Error terminating mpv:", e)
+                cmd = ['mpv', f'--input-ipc-server={MPV_SOCKET}', stream]
+                # Sockets Python opens are non-inheritable, so close_fds=False
+                # leaks nothing and spares the child from closing the fd table.
+                # mpv gets its own session and no pipes it could block on.
+                mpv_process = subprocess.Popen(
+                    cmd,
+                    close_fds=False,
+                    start_new_session=True,
+                    stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
             return jsonify({"success": True, "stream": stream})
         else:
             return jsonify({"success": False, "error": "No stream provided"})
     else:
         # Stream launching page with dark deep blue background
-        html = """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <title>Launch mpv Stream</title>
-            <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css">
-            <style>
-                body {
-                    padding: 20px;
-                    background-color: #061008;
-                    color: white;
-                }
-                .form-label, .form-select, .btn {
-                    background-color: #061008;
-                    color: white;
-                }
-                .btn:hover {
-                    opacity: 0.8;
-                }
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1 class="mb-4">Launch mpv Stream</h1>
-                <form id="launchForm">
-                    <div class="mb-3">
-                        <label for="stream" class="form-label">Select a stream:</label>
-                        <select name="stream" id="stream" class="form-select">
-                            <option value="https://somafm.com/nossl/deepspaceone130.pls">Deep Space One</option>
-                            <option value="https://somafm.com/nossl/lush130.pls">Lush</option>
-                            <option value="https://somafm.com/metal130.pls">Metal</option>
-                            <option value="https://somafm.com/dronezone130.pls">Drone Zone</option>
-                            <option value="https://somafm.com/nossl/sonicuniverse130.pls">Sonic Universe</option>
-                        </select>
-                    </div>
-                    <button type="submit" class="btn btn-primary">Launch Stream</button>
-                </form>
-                <div id="status" class="mt-3"></div>
-                <br>
-                <a href="/" class="btn btn-secondary">Back to Controller</a>
-            </div>
-            <script>
-                function updateStatus(message, success=true) {
-                    const statusDiv = document.getElementById("status");
-                    statusDiv.textContent = message;
-                    statusDiv.className = success ? "alert alert-success" : "alert alert-danger";
-                }
-                document.getElementById("launchForm").addEventListener("submit", function(e){
-                    e.preventDefault();
-                    const formData = new FormData(this);
-                    fetch('/launch', {
-                        method: 'POST',
-                        body: formData
-                    })
-                    .then(response => response.json())
-                    .then(data => {
-                        if(data.success) {
-                            updateStatus("Stream launched successfully!");
-                        } else {
-                            updateStatus("Error launching stream: " + data.error, false);
-                        }
-                    });
-                });
-            </script>
-        </body>
-        </html>
-        """
-        return render_template_string(html)
+        return _page_response('launch.html')
 
 @app.route('/')
 def index():
     # Main controller page with a dark deep blue background and Bootstrap styling
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>mpv Controller</title>
-        <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css">
-        <style>
-            body {
-                padding: 20px;
-                background-color: #001f3f;
-                color: white;
-            }
-            .btn {
-                margin: 5px;
-            }
-            #status {
-                margin-top: 20px;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container text-center">
-            <h1 class="mb-4">mpv Controller</h1>
-            <div class="btn-group" role="group">
-                <button class="btn btn-primary" id="toggleBtn">Toggle Play/Pause</button>
-                <button class="btn btn-danger" id="stopBtn">Stop</button>
-                <button class="btn btn-success" id="volUpBtn">Volume Up</button>
-                <button class="btn btn-warning" id="volDownBtn">Volume Down</button>
-            </div>
-            <br><br>
-            <a href="/launch" class="btn btn-secondary">Launch Internet Radio Stream</a>
-            <div id="status"></div>
-        </div>
-        <script>
-            function updateStatus(message, success = true) {
-                const statusDiv = document.getElementById("status");
-                statusDiv.textContent = message;
-                statusDiv.className = success ? "alert alert-success" : "alert alert-danger";
-            }
-            document.getElementById("toggleBtn").addEventListener("click", function(){
-                fetch('/toggle', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    updateStatus(data.success ? 'Toggled play/pause successfully' : 'Error toggling play/pause', data.success);
-                });
-            });
-            document.getElementById("stopBtn").addEventListener("click", function(){
-                fetch('/stop', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    updateStatus(data.success ? 'mpv stopped successfully' : 'Error stopping mpv', data.success);
-                });
-            });
-            document.getElementById("volUpBtn").addEventListener("click", function(){
-                fetch('/volume/up', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    updateStatus(data.success ? 'Volume increased' : 'Error increasing volume', data.success);
-                });
-            });
-            document.getElementById("volDownBtn").addEventListener("click", function(){
-                fetch('/volume/down', {method: 'POST'})
-                .then(response => response.json())
-                .then(data => {
-                    updateStatus(data.success ? 'Volume decreased' : 'Error decreasing volume', data.success);
-                });
-            });
-        </script>
-    </body>
-    </html>
-    """
-    return render_template_string(html)
+    return _page_response('controller.html')
+
+def _page_response(filename):
+    """
+    Serve a page from the static folder. Werkzeug streams the file from
+    disk and sets ETag/Last-Modified, so browsers revalidate with a 304.
+    """
+    return send_from_directory(app.static_folder, filename, max_age=PAGE_MAX_AGE)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    app.run(host='0.0.0.0', port=5000, request_handler=NoDelayRequestHandler)
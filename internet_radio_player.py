@@ -1,12 +1,18 @@
 #!/usr/bin/env python3
-import json
 import socket
 import threading
 import time
 import os
 import subprocess
 import logging
-from flask import Flask, request, jsonify, Response, render_template, redirect, url_for, send_from_directory
+import itertools
+import atexit
+import hashlib
+from concurrent.futures import Future
+import orjson
+from flask import Flask, request, jsonify, Response, redirect, url_for, send_from_directory
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.routing import IntegerConverter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -20,6 +26,32 @@ RADIO_STATIONS = [
     {"name": "Drone Zone", "url": "https://somafm.com/dronezone130.pls", "description": "Atmospheric ambient music"},
     {"name": "Sonic Universe", "url": "https://somafm.com/nossl/sonicuniverse130.pls", "description": "Jazz and avant-garde"}
 ]
+# Station fields looked up by index on every command and status
+STATION_NAMES = tuple(station["name"] for station in RADIO_STATIONS)
+STATION_URLS = tuple(station["url"] for station in RADIO_STATIONS)
+
+# The station list never changes, so it is serialized once along with its ETag
+STATIONS_BODY = orjson.dumps(RADIO_STATIONS)
+STATIONS_ETAG = hashlib.sha1(STATIONS_BODY).hexdigest()
+
+# Seconds to wait for MPV to answer an IPC command
+IPC_TIMEOUT = 2.0
+# Seconds to wait for a newly started MPV to accept IPC connections
+MPV_START_TIMEOUT = 3.0
+# Seconds volume changes are collected before the latest one is sent to MPV
+VOLUME_COALESCE_DELAY = 0.05
+# Seconds between keepalive comments on an idle /api/events stream
+EVENT_KEEPALIVE_INTERVAL = 30
+# MPV properties that affect the status; MPV pushes their changes to us.
+# idle-active turns true once playback stops or a stream ends.
+OBSERVED_PROPERTIES = ("media-title", "volume", "pause", "idle-active")
+
+# Playback commands, serialized up to the request_id. _SET_VOLUME takes the
+# volume first, which leaves the %d for the request_id.
+_CYCLE_PAUSE = b'{"command":["cycle","pause"],"request_id":%d}\n'
+_UNPAUSE = b'{"command":["set_property","pause",false],"request_id":%d}\n'
+_STOP = b'{"command":["stop"],"request_id":%d}\n'
+_SET_VOLUME = b'{"command":["set_property","volume",%d],"request_id":%%d}\n'
 
 class MPVController:
     """Controls the MPV media player through socket communication."""
@@ -28,14 +60,32 @@ class MPVController:
         self.socket_path = socket_path
         self.mpv_process = None
         self.current_station = None
-        self.playing = False
         self.volume = 50
+        # Whether MPV is up with its IPC socket. Checked instead of stat()ing
+        # the socket path on every request.
+        self.socket_ready = False
+        # Persistent IPC connection. Replies are read by a background thread
+        # and handed to the waiting caller by request_id.
+        self._sock = None
+        self._sock_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        # Volume waiting to be sent by _flush_volume(); None when nothing is queued
+        self._pending_volume = None
+        self._volume_lock = threading.Lock()
+        # Latest values pushed by MPV for OBSERVED_PROPERTIES. status_version is
+        # bumped and status_changed notified whenever the status may have changed.
+        self._observed = dict.fromkeys(OBSERVED_PROPERTIES)
+        self.status_changed = threading.Condition()
+        self.status_version = 0
         
     def start_mpv(self):
         """Start the MPV media player process with socket control."""
         if self.mpv_process is not None and self.mpv_process.poll() is None:
             logger.info("MPV is already running")
-            return
+            self.socket_ready = True
+            return True
             
         # Remove socket file if it exists
         try:
@@ -45,12 +95,27 @@ class MPVController:
             logger.error(f"Error removing socket file: {e}")
         
         # Start MPV with IPC socket for control
-        cmd = ["mpv", "--idle", "--input-ipc-server=" + self.socket_path, "--volume=" + str(self.volume)]
+        # Its output is discarded; nobody reads it, and a full pipe would stall MPV
+        cmd = ["mpv", "--idle", "--msg-level=all=no", "--input-ipc-server=" + self.socket_path, "--volume=" + str(self.volume)]
         try:
-            self.mpv_process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            self.mpv_process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             logger.info("MPV started with process ID: %s", self.mpv_process.pid)
-            # Wait a moment for MPV to create the socket
-            time.sleep(1) 
+            threading.Thread(target=self._watch_mpv, args=(self.mpv_process,), daemon=True).start()
+            # Poll until MPV accepts connections, backing off from 10 ms to 100 ms
+            deadline = time.monotonic() + MPV_START_TIMEOUT
+            delay = 0.01
+            while True:
+                try:
+                    with self._sock_lock:
+                        self._connect()
+                    break
+                except OSError as e:
+                    if time.monotonic() >= deadline or self.mpv_process.poll() is not None:
+                        logger.error(f"Error connecting to MPV: {e}")
+                        return False
+                time.sleep(delay)
+                delay = min(delay * 2, 0.1)
+            self.socket_ready = True
             return True
         except Exception as e:
             logger.error(f"Failed to start MPV: {e}")
@@ -58,56 +123,198 @@ class MPVController:
     
     def stop_mpv(self):
         """Stop the MPV media player process."""
-        if self.mpv_process is not None:
+        self.socket_ready = False
+        # Cleared first so _watch_mpv knows this exit is expected
+        process, self.mpv_process = self.mpv_process, None
+        if process is not None:
             try:
-                self.mpv_process.terminate()
-                self.mpv_process.wait(timeout=5)
+                process.terminate()
+                process.wait(timeout=5)
                 logger.info("MPV process terminated")
             except subprocess.TimeoutExpired:
-                self.mpv_process.kill()
+                process.kill()
                 logger.warning("MPV process killed after timeout")
-            self.mpv_process = None
-            self.playing = False
             self.current_station = None
+            self._status_updated()
+        with self._sock_lock:
+            self._disconnect()
     
-    def send_command(self, command):
-        """Send a command to MPV via socket."""
-        if not os.path.exists(self.socket_path):
-            logger.error("MPV socket does not exist. Is MPV running?")
-            return None
+    def _watch_mpv(self, process):
+        """Wait for MPV to exit, and clean up if it was not stopped through stop_mpv."""
+        process.wait()
+        if self.mpv_process is not process:
+            return
+        logger.warning(f"MPV exited unexpectedly with code {process.returncode}")
+        self.socket_ready = False
+        with self._sock_lock:
+            self._disconnect()
+        self.current_station = None
+        self._status_updated()
+    
+    def _connect(self):
+        """Open the IPC connection and start its reader thread. Requires _sock_lock."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self._sock = sock
+        # Each connection tracks its own outstanding requests, so losing one
+        # only fails the requests that were sent on it
+        self._pending = {}
+        threading.Thread(target=self._reader_loop, args=(sock, self._pending), daemon=True).start()
+        # Have MPV push status changes on this connection instead of being polled
+        sock.sendall(b"".join(
+            orjson.dumps({"command": ["observe_property", observe_id, name]}) + b"\n"
+            for observe_id, name in enumerate(OBSERVED_PROPERTIES, 1)
+        ))
+    
+    def _status_updated(self):
+        """Wake the /api/events streams."""
+        with self.status_changed:
+            self.status_version += 1
+            self.status_changed.notify_all()
+    
+    def _disconnect(self):
+        """Close the IPC connection, if open. Requires _sock_lock."""
+        if self._sock is None:
+            return
+        try:
+            # Wakes the reader thread, which fails any requests still waiting
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+        self._sock = None
+    
+    def _reader_loop(self, sock, pending):
+        """Dispatch replies from MPV to the callers waiting on them."""
+        try:
+            with sock.makefile('rb') as reader:
+                for line in reader:
+                    message = orjson.loads(line)
+                    request_id = message.get("request_id")
+                    if request_id is None:
+                        if message.get("event") == "property-change":
+                            self._property_changed(message.get("name"), message.get("data"))
+                        # Other events (e.g. file-loaded) are not used
+                        continue
+                    with self._pending_lock:
+                        future = pending.pop(request_id, None)
+                    if future is not None:
+                        future.set_result(message)
+        except Exception as e:
+            logger.error(f"Error reading from MPV: {e}")
         
+        # MPV closed the connection; drop it and fail anything still waiting.
+        # Unless we closed it ourselves, MPV has gone away.
+        with self._sock_lock:
+            mpv_gone = self._sock is sock
+            if mpv_gone:
+                self._sock = None
+                self.socket_ready = False
+        sock.close()
+        with self._pending_lock:
+            futures = list(pending.values())
+            pending.clear()
+        for future in futures:
+            future.set_exception(ConnectionError("MPV closed the IPC connection"))
+        if mpv_gone:
+            self._status_updated()
+    
+    def _property_changed(self, name, value):
+        """Record a property value pushed by MPV."""
+        if name not in self._observed or self._observed[name] == value:
+            return
+        self._observed[name] = value
+        # Keep the volume the commands rely on in step with MPV
+        if name == "volume" and value is not None:
+            self.volume = value
+        self._status_updated()
+    
+    @property
+    def playing(self):
+        """Whether a station is loaded and MPV last reported it as neither paused nor idle."""
+        return (self.current_station is not None
+                and self._observed["pause"] is False
+                and not self._observed["idle-active"])
+    
+    def _submit(self, command):
+        """Send a command to MPV without waiting. Returns a Future for the reply, or None."""
+        return self._submit_many([command])[0]
+    
+    def _submit_many(self, commands):
+        """Send several commands to MPV in a single write. Returns a Future (or None) per command.
+        
+        A command is either a dict or a pre-serialized bytes template with a %d for the request_id.
+        """
+        if not self.socket_ready:
+            logger.error("MPV socket is not ready. Is MPV running?")
+            return [None] * len(commands)
+        
+        request_ids = [next(self._request_ids) for _ in commands]
+        payload = b"".join(
+            command % request_id if isinstance(command, bytes)
+            else orjson.dumps(dict(command, request_id=request_id)) + b"\n"
+            for command, request_id in zip(commands, request_ids)
+        )
+        with self._sock_lock:
+            for attempt in range(2):
+                futures = [Future() for _ in commands]
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    with self._pending_lock:
+                        self._pending.update(zip(request_ids, futures))
+                    self._sock.sendall(payload)
+                    return futures
+                except OSError as e:
+                    with self._pending_lock:
+                        for request_id in request_ids:
+                            self._pending.pop(request_id, None)
+                    self._disconnect()
+                    if attempt:
+                        logger.error(f"Error sending command to MPV: {e}")
+                        self.socket_ready = False
+                    # Otherwise the connection was stale (e.g. MPV restarted); reconnect and resend once
+        return [None] * len(commands)
+    
+    def _wait(self, future):
+        """Wait for the reply to a command sent with _submit."""
+        if future is None:
+            return None
         try:
-            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
-                sock.connect(self.socket_path)
-                sock.sendall((json.dumps(command) + "\n").encode())
-                # Wait for response
-                response = sock.recv(1024).decode().strip()
-                if response:
-                    return json.loads(response)
-                return None
+            return future.result(timeout=IPC_TIMEOUT)
         except Exception as e:
-            logger.error(f"Error sending command to MPV: {e}")
+            logger.error(f"Error waiting for MPV response: {e!r}")
             return None
     
+    def send_command(self, command):
+        """Send a command to MPV via socket."""
+        return self._wait(self._submit(command))
+    
     def play_station(self, station_idx):
         """Play a radio station by index."""
         if station_idx < 0 or station_idx >= len(RADIO_STATIONS):
             logger.error(f"Invalid station index: {station_idx}")
             return False
         
-        if not os.path.exists(self.socket_path):
+        if not self.socket_ready:
             success = self.start_mpv()
             if not success:
                 return False
         
-        station = RADIO_STATIONS[station_idx]
-        command = {"command": ["loadfile", station["url"]]}
+        command = {"command": ["loadfile", STATION_URLS[station_idx]]}
         
-        response = self.send_command(command)
+        # MPV keeps the pause state across loadfile, so unpause with the same write
+        loadfile, unpause = self._submit_many((command, _UNPAUSE))
+        response = self._wait(loadfile)
+        self._wait(unpause)
         if response is not None:
             self.current_station = station_idx
-            self.playing = True
-            logger.info(f"Playing station: {station['name']}")
+            self._status_updated()
+            logger.debug("Playing station: %s", STATION_NAMES[station_idx])
             return True
         return False
     
@@ -118,126 +325,142 @@ class MPVController:
                 return self.play_station(self.current_station)
             return False
         
-        command = {"command": ["cycle", "pause"]}
-        response = self.send_command(command)
+        response = self.send_command(_CYCLE_PAUSE)
         
         if response is not None:
-            self.playing = not self.playing
-            state = "paused" if not self.playing else "resumed"
-            logger.info(f"Playback {state}")
+            # playing follows once MPV pushes the pause change
+            logger.debug("Playback paused")
             return True
         return False
     
     def stop(self):
         """Stop playback."""
-        command = {"command": ["stop"]}
-        response = self.send_command(command)
+        response = self.send_command(_STOP)
         
         if response is not None:
-            self.playing = False
-            logger.info("Playback stopped")
+            # playing follows once MPV pushes idle-active; current_station is
+            # kept so Play restarts the last station
+            logger.debug("Playback stopped")
             return True
         return False
     
     def set_volume(self, volume):
-        """Set volume (0-100)."""
+        """Set volume (0-100).
+        
+        The change is sent VOLUME_COALESCE_DELAY later, so a burst of slider
+        events only sends its last value to MPV.
+        """
         if volume < 0 or volume > 100:
             logger.error(f"Volume must be between 0 and 100, got {volume}")
             return False
+        if not self.socket_ready:
+            logger.error("MPV socket is not ready. Is MPV running?")
+            return False
         
-        command = {"command": ["set_property", "volume", volume]}
-        response = self.send_command(command)
+        with self._volume_lock:
+            if self._pending_volume is None:
+                if volume == self.volume:
+                    return True
+                threading.Timer(VOLUME_COALESCE_DELAY, self._flush_volume).start()
+            self._pending_volume = volume
+        return True
+    
+    def _flush_volume(self):
+        """Send the latest volume queued by set_volume."""
+        with self._volume_lock:
+            volume, self._pending_volume = self._pending_volume, None
+        if volume == self.volume:
+            return
+        
+        response = self.send_command(_SET_VOLUME % volume)
         
         if response is not None:
             self.volume = volume
-            logger.info(f"Volume set to {volume}")
-            return True
-        return False
+            self._status_updated()
+            logger.debug("Volume set to %s", volume)
     
     def get_status(self):
-        """Get current playback status."""
-        # Get current media
-        property_commands = [
-            {"command": ["get_property", "media-title"]},
-            {"command": ["get_property", "volume"]},
-            {"command": ["get_property", "pause"]}
-        ]
-        
-        media_title = "Unknown"
-        paused = True
-        
-        try:
-            # Get media title
-            response = self.send_command(property_commands[0])
-            if response and "data" in response:
-                media_title = response["data"]
-                
-            # Get volume
-            response = self.send_command(property_commands[1])
-            if response and "data" in response:
-                self.volume = response["data"]
-            
-            # Get pause state
-            response = self.send_command(property_commands[2])
-            if response and "data" in response:
-                paused = response["data"]
-                self.playing = not paused
-                
-            return {
-                "playing": self.playing,
-                "station_index": self.current_station,
-                "station_name": RADIO_STATIONS[self.current_station]["name"] if self.current_station is not None else None,
-                "media_title": media_title,
-                "volume": self.volume
-            }
-        except Exception as e:
-            logger.error(f"Error getting status: {e}")
-            return {
-                "playing": self.playing,
-                "station_index": self.current_station,
-                "station_name": RADIO_STATIONS[self.current_station]["name"] if self.current_station is not None else None,
-                "media_title": "Unknown",
-                "volume": self.volume
-            }
+        """Get current playback status from the properties MPV pushes to us."""
+        media_title = self._observed["media-title"]
+        return {
+            "playing": self.playing,
+            "station_index": self.current_station,
+            "station_name": STATION_NAMES[self.current_station] if self.current_station is not None else None,
+            "media_title": media_title if media_title is not None else "Unknown",
+            "volume": self.volume
+        }
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes jsonify() responses with orjson."""
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+class StationConverter(IntegerConverter):
+    """URL converter that only matches valid indexes into RADIO_STATIONS."""
+    def __init__(self, url_map):
+        super().__init__(url_map, min=0, max=len(RADIO_STATIONS) - 1)
+
+class VolumeConverter(IntegerConverter):
+    """URL converter that only matches volumes from 0 to 100."""
+    def __init__(self, url_map):
+        super().__init__(url_map, min=0, max=100)
 
 # Initialize the MPV controller
 mpv = MPVController()
 
 # Initialize the Flask application
 app = Flask(__name__)
-
-# Add enumerate filter to Jinja2
-app.jinja_env.filters['enumerate'] = enumerate
+app.json = ORJSONProvider(app)
+# Out-of-range station indexes and volumes 404 without reaching the handlers
+app.url_map.converters['station'] = StationConverter
+app.url_map.converters['vol'] = VolumeConverter
+
+# Status reported while MPV is not running, apart from the volume
+_STATUS_NONE = {
+    "playing": False,
+    "station_index": None,
+    "station_name": None,
+    "media_title": None
+}
+
+def current_status():
+    """Return the playback status, or an idle one if MPV is not running."""
+    if not mpv.socket_ready:
+        return {**_STATUS_NONE, "volume": mpv.volume}
+    return mpv.get_status()
 
 # Serve the HTML UI
 @app.route('/')
 def index():
     """Serve the main page."""
-    status = mpv.get_status() if os.path.exists(mpv.socket_path) else {
-        "playing": False,
-        "station_index": None,
-        "station_name": None,
-        "media_title": None,
-        "volume": mpv.volume
-    }
-    
-    return render_template('index.html', 
-                          stations=RADIO_STATIONS, 
-                          status=status)
+    status = current_status()
+    # The rest of the page never changes; only the initial status is filled in
+    bootstrap = orjson.dumps({
+        "playing": status["playing"],
+        "stationIndex": status["station_index"],
+        "volume": status["volume"]
+    }).decode()
+    return INDEX_PREFIX + bootstrap + INDEX_SUFFIX
 
 # API endpoint to get the list of available stations
 @app.route('/api/stations', methods=['GET'])
 def get_stations():
     """Return the list of radio stations."""
-    return jsonify(RADIO_STATIONS)
+    response = Response(STATIONS_BODY, mimetype='application/json')
+    response.set_etag(STATIONS_ETAG)
+    response.cache_control.max_age = 86400
+    return response.make_conditional(request)
 
 # API endpoint to play a station
-@app.route('/api/play/<int:station_idx>', methods=['POST'])
+@app.route('/api/play/<station:station_idx>', methods=['POST'])
 def play_station(station_idx):
     """Play a radio station by index."""
     success = mpv.play_station(station_idx)
     if success:
-        return jsonify({"status": "success", "message": f"Playing {RADIO_STATIONS[station_idx]['name']}"})
+        return jsonify({"status": "success", "message": f"Playing {STATION_NAMES[station_idx]}"})
     else:
         return jsonify({"status": "error", "message": "Failed to play station"}), 500
 
@@ -245,9 +468,10 @@ def play_station(station_idx):
 @app.route('/api/pause', methods=['POST'])
 def toggle_pause():
     """Toggle play/pause state."""
+    # MPV reports the new pause state asynchronously, so go by the state before the toggle
+    state = "paused" if mpv.playing else "resumed"
     success = mpv.toggle_pause()
     if success:
-        state = "paused" if not mpv.playing else "resumed"
         return jsonify({"status": "success", "message": f"Playback {state}"})
     else:
         return jsonify({"status": "error", "message": "Failed to toggle pause"}), 500
@@ -263,7 +487,7 @@ def stop():
         return jsonify({"status": "error", "message": "Failed to stop playback"}), 500
 
 # API endpoint to set volume
-@app.route('/api/volume/<int:volume>', methods=['POST'])
+@app.route('/api/volume/<vol:volume>', methods=['POST'])
 def set_volume(volume):
     """Set volume (0-100)."""
     success = mpv.set_volume(volume)
@@ -276,17 +500,38 @@ def set_volume(volume):
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """Get current playback status."""
-    if not os.path.exists(mpv.socket_path):
-        return jsonify({
-            "playing": False,
-            "station_index": None,
-            "station_name": None,
-            "media_title": None,
-            "volume": mpv.volume
-        })
+    body = orjson.dumps(current_status())
+    response = Response(body, mimetype='application/json')
+    # Let the browser absorb repeated polls within a second, and answer
+    # revalidations of an unchanged status with an empty 304
+    response.cache_control.max_age = 1
+    response.set_etag(hashlib.sha1(body).hexdigest())
+    return response.make_conditional(request)
+
+# Stream status changes pushed by MPV
+@app.route('/api/events')
+def events():
+    """Send the playback status as Server-Sent Events whenever it changes."""
+    def stream():
+        version = None
+        sent = None
+        while True:
+            with mpv.status_changed:
+                mpv.status_changed.wait_for(lambda: mpv.status_version != version, EVENT_KEEPALIVE_INTERVAL)
+                changed = mpv.status_version != version
+                version = mpv.status_version
+            if not changed:
+                yield b": keepalive\n\n"
+                continue
+            # A command and the property change it causes both bump the version
+            event = b"data: " + orjson.dumps(current_status()) + b"\n\n"
+            if event != sent:
+                sent = event
+                yield event
     
-    status = mpv.get_status()
-    return jsonify(status)
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # API endpoint to restart MPV if it crashed
 @app.route('/api/restart_mpv', methods=['POST'])
@@ -312,13 +557,8 @@ def serve_static(path):
     """Serve static files."""
     return send_from_directory('static', path)
 
-# Create the templates directory and the index.html file inside it
-def create_templates():
-    """Create the templates directory and index.html file."""
-    os.makedirs('templates', exist_ok=True)
-    
-    with open('templates/index.html', 'w') as f:
-        f.write('''<!DOCTYPE html>
+# The page, rendered once by render_index_page()
+HTML_SOURCE = '''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -482,7 +722,7 @@ def create_templates():
         <h2>Available Stations</h2>
         <ul class="stations" id="stations-list">
             {% for station in stations %}
-            <li class="station-item {% if status.station_index == loop.index0 %}active{% endif %}" onclick="playStation({{ loop.index0 }})">
+            <li class="station-item" onclick="playStation({{ loop.index0 }})">
                 <div class="station-name">{{ station.name }}</div>
                 <div class="station-description">{{ station.description }}</div>
             </li>
@@ -501,13 +741,10 @@ def create_templates():
         <p>SomaFM Internet Radio Player</p>
     </div>
 
+    <script id="bootstrap" type="application/json">{{ bootstrap }}</script>
     <script>
-        // Store the current state
-        let currentState = {
-            playing: {% if status.playing %}true{% else %}false{% endif %},
-            stationIndex: {% if status.station_index is not none %}{{ status.station_index }}{% else %}null{% endif %},
-            volume: {{ status.volume }}
-        };
+        // Store the current state, as embedded by the server
+        let currentState = JSON.parse(document.getElementById('bootstrap').textContent);
 
         // Update UI based on initial state
         updateUI();
@@ -640,24 +877,27 @@ def create_templates():
             }
         }
 
+        // Apply a status received from the server
+        function applyStatus(data) {
+            // Update the current state
+            currentState.playing = data.playing;
+            currentState.stationIndex = data.station_index;
+            currentState.volume = data.volume;
+            
+            // Update the UI
+            document.getElementById('current-station').textContent = 
+                data.station_name ? data.station_name : 'None';
+            document.getElementById('media-title').textContent = 
+                data.media_title ? data.media_title : 'Not playing';
+            
+            updateUI();
+        }
+
         // Refresh status
         function refreshStatus() {
             fetch('/api/status')
                 .then(response => response.json())
-                .then(data => {
-                    // Update the current state
-                    currentState.playing = data.playing;
-                    currentState.stationIndex = data.station_index;
-                    currentState.volume = data.volume;
-                    
-                    // Update the UI
-                    document.getElementById('current-station').textContent = 
-                        data.station_name ? data.station_name : 'None';
-                    document.getElementById('media-title').textContent = 
-                        data.media_title ? data.media_title : 'Not playing';
-                    
-                    updateUI();
-                })
+                .then(applyStatus)
                 .catch(error => {
                     console.error("Error:", error);
                     // Don't show alert, just log to console
@@ -689,29 +929,43 @@ def create_templates():
             });
         }
 
-        // Periodically refresh status
-        setInterval(refreshStatus, 5000);
+        // Let the server push status changes; fall back to periodic
+        // refreshes in browsers without EventSource support
+        if (window.EventSource) {
+            new EventSource('/api/events').onmessage = (e) => applyStatus(JSON.parse(e.data));
+        } else {
+            setInterval(refreshStatus, 5000);
+        }
     </script>
 </body>
-</html>''')
+</html>'''
+
+# Placeholder for the initial status, which index() fills in per request
+BOOTSTRAP_MARKER = "\x00bootstrap\x00"
 
-# Create the static directory
-def create_static_directory():
-    """Create the static directory for CSS, JS, and other static files."""
-    os.makedirs('static', exist_ok=True)
+def render_index_page():
+    """Render the page once, split around the initial status."""
+    html = app.jinja_env.from_string(HTML_SOURCE).render(stations=RADIO_STATIONS, bootstrap=BOOTSTRAP_MARKER)
+    prefix, _, suffix = html.partition(BOOTSTRAP_MARKER)
+    return prefix, suffix
+
+INDEX_PREFIX, INDEX_SUFFIX = render_index_page()
 
 # Main entry point
-if __name__ == '__main__':
-    # Create necessary directories and files
-    create_templates()
-    create_static_directory()
+def create_app():
+    """Start MPV, then return the app.
     
-    # Start MPV automatically
-    mpv.start_mpv()
+    Used as the gunicorn entry point:
+    
+        gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5000 'internet_radio_player:create_app()'
     
-    # Start the Flask application
-    try:
-        app.run(host='0.0.0.0', port=5000, debug=True)
-    finally:
-        # Ensure MPV is shut down when the application exits
-        mpv.stop_mpv()
+    Keep a single worker: MPV and its IPC connection belong to one process.
+    """
+    # Start MPV automatically, and make sure it is shut down when the server exits
+    mpv.start_mpv()
+    atexit.register(mpv.stop_mpv)
+    return app
+
+if __name__ == '__main__':
+    # Flask's server without the debugger and reloader; use gunicorn for anything long-running
+    create_app().run(host='0.0.0.0', port=5000, threaded=True)
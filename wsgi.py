@@ -0,0 +1,10 @@
+"""
+WSGI entry point for the mpv controller, for use with a production server:
+
+    gunicorn -w 1 -k gthread --threads 8 -b 0.0.0.0:5000 wsgi:app
+
+Keep a single worker: the mpv process handle and the IPC connection live
+in the server process. Threads let a slow /stop or /launch run without
+blocking the other buttons.
+"""
+from controller import app